@@ -6,6 +6,9 @@
 
 from typing import Dict, List, Any
 
+# 購入プラン1行分のテンプレート（購入ガイドv1/v2で共通）
+_PLAN_ROW = "{index}. 単勝 {number}番 {name}: {amount}円\n"
+
 
 class BettingStrategy:
     """賭け戦略・購入プランクラス"""
@@ -165,7 +168,7 @@ class BettingStrategy:
     def _generate_purchase_guide(self, honmei: Dict, taikou: Dict, anaume: Dict,
                                 purchase_plan: List[Dict]) -> str:
         """購入ガイド生成"""
-        guide = f"""
+        parts = [f"""
 【購入ガイド - 単勝3点買い】
 ={'='*50}
 
@@ -180,14 +183,16 @@ class BettingStrategy:
    オッズ: {anaume['odds']}倍 | 評価: {anaume.get('final_score', 0)}点
 
 購入プラン（単勝のみ）
-"""
+"""]
         
         for i, plan in enumerate(purchase_plan, 1):
             horse = plan['horses'][0]
-            guide += f"{i}. 単勝 {horse['number']}番 {horse['name']}: {plan['amount']}円\n"
+            parts.append(_PLAN_ROW.format(
+                index=i, number=horse['number'], name=horse['name'], amount=plan['amount']
+            ))
         
         total_amount = sum(p['amount'] for p in purchase_plan)
-        guide += f"""
+        parts.append(f"""
 投資戦略
 総投資額: {total_amount}円
 購入馬券: 単勝3点
@@ -200,9 +205,9 @@ class BettingStrategy:
 ・投資は自己責任でお願いします
 ・オッズは変動する可能性があります
 ・予想は過去データに基づく分析です
-"""
+""")
         
-        return guide
+        return "".join(parts)
 
     def _generate_purchase_guide_v2(self, honmei: Dict, taikou_list: List[Dict], 
                                    anaume_list: List[Dict], purchase_plan: List[Dict]) -> str:
@@ -216,7 +221,7 @@ class BettingStrategy:
         else:
             plan_type = f"単勝{plan_count}点買い"
         
-        guide = f"""
+        parts = [f"""
 【購入ガイド - {plan_type}】
 {'='*50}
 
@@ -225,36 +230,38 @@ class BettingStrategy:
 【本命】 {honmei['number']}番 {honmei['name']}
    オッズ: {honmei['odds']}倍 | 実力評価: {honmei.get('ability_score', 0):.2f}点
    理由: 実力評価で最高スコア
-"""
+"""]
         
         # 対抗馬を追加
         if taikou_list:
             for i, taikou in enumerate(taikou_list, 1):
-                guide += f"""
+                parts.append(f"""
 【対抗{i}】 {taikou['number']}番 {taikou['name']}
    オッズ: {taikou['odds']}倍 | 実力評価: {taikou.get('ability_score', 0):.2f}点
-"""
+""")
         
         # 穴馬を追加
         if anaume_list:
             for i, anaume in enumerate(anaume_list, 1):
-                guide += f"""
+                parts.append(f"""
 【穴馬{i}】 {anaume['number']}番 {anaume['name']}
    オッズ: {anaume['odds']}倍 | 期待値評価: {anaume.get('value_score', 0):.2f}点
    理由: 実力に対してオッズが割安
-"""
+""")
         
         # 購入プラン詳細
-        guide += f"""
+        parts.append("""
 ◆ 購入プラン（単勝のみ）
-"""
+""")
         
         for i, plan in enumerate(purchase_plan, 1):
             horse = plan['horses'][0]
-            guide += f"{i}. 単勝 {horse['number']}番 {horse['name']}: {plan['amount']}円\n"
+            parts.append(_PLAN_ROW.format(
+                index=i, number=horse['number'], name=horse['name'], amount=plan['amount']
+            ))
         
         total_amount = sum(p['amount'] for p in purchase_plan)
-        guide += f"""
+        parts.append(f"""
 ◆ 投資戦略
 総投資額: {total_amount}円
 購入馬券: {plan_type}
@@ -267,6 +274,6 @@ class BettingStrategy:
 ・投資は自己責任でお願いします
 ・オッズは変動する可能性があります
 ・予想は過去データに基づく分析です
-"""
+""")
         
-        return guide
+        return "".join(parts)
@@ -5,6 +5,7 @@
 """
 
 import os
+import re
 import orjson
 import sqlite3
 import gc
@@ -13,6 +14,26 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 
 
+# 競馬関連キーワード（モジュール名に大文字小文字を区別せず含まれるか判定）
+_KEIBA_MODULE_KEYWORDS = (
+    'keiba', 'predictor', 'race', 'horse', 'dark_horse',
+    'pdf_to_json', 'pdf_reader', 'improved_predictor',
+    'run_prediction', 'CorePredictor', 'FastAnaumaDB', 
+    'TimeManager', 'clean_predictor', 'japanese_data',
+    'complete_extraction', 'complete_horse_data',
+    'quality_assessment', 'race_prediction_pipeline'
+)
+_KEIBA_MODULE_PATTERN = re.compile(
+    '|'.join(map(re.escape, _KEIBA_MODULE_KEYWORDS)), re.IGNORECASE
+)
+
+# クリア対象のSQLiteキャッシュテーブル（DELETE文に埋め込むため固定の名前に限定）
+_CACHE_TABLES = ('temp_predictions', 'cache_evaluations', 'session_data')
+
+# このモジュールの配置ディレクトリ（既定のプロジェクトディレクトリ）
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
 class DataCleaner:
     """ソフト内部の古いデータを完全にクリアするクラス"""
     
@@ -69,10 +90,9 @@ class DataCleaner:
             with sqlite3.connect(db_path) as conn:
                 cursor = conn.cursor()
                 
-                tables_to_clear = ['temp_predictions', 'cache_evaluations', 'session_data']
                 cleared_count = 0
                 
-                for table in tables_to_clear:
+                for table in _CACHE_TABLES:
                     try:
                         cursor.execute(f"DELETE FROM {table}")
                         cleared_count += 1
@@ -112,26 +132,12 @@ class DataCleaner:
         import sys
         print("[推論] Pythonモジュールキャッシュを強制クリア中...")
         
-        # 競馬関連キーワード
-        keiba_keywords = [
-            'keiba', 'predictor', 'race', 'horse', 'dark_horse',
-            'pdf_to_json', 'pdf_reader', 'improved_predictor',
-            'run_prediction', 'CorePredictor', 'FastAnaumaDB', 
-            'TimeManager', 'clean_predictor', 'japanese_data',
-            'complete_extraction', 'complete_horse_data',
-            'quality_assessment', 'race_prediction_pipeline'
+        # パターンマッチで対象モジュールを特定（自分自身は除外）
+        modules_to_remove = [
+            module_name for module_name in list(sys.modules.keys())
+            if _KEIBA_MODULE_PATTERN.search(module_name) and 'data_loader' not in module_name
         ]
         
-        # パターンマッチで対象モジュールを特定
-        modules_to_remove = []
-        for module_name in list(sys.modules.keys()):
-            for keyword in keiba_keywords:
-                if keyword.lower() in module_name.lower():
-                    # 自分自身は除外
-                    if 'data_loader' not in module_name:
-                        modules_to_remove.append(module_name)
-                        break
-        
         # モジュール削除実行
         cleared_count = 0
         for module_name in modules_to_remove:
@@ -247,8 +253,7 @@ class SafeDataLoader:
     
     def safe_load_config(self, config_path: str = 'config.json') -> Dict[str, Any]:
         """安全な設定ファイル読み込み"""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        full_path = os.path.join(script_dir, config_path)
+        full_path = os.path.join(_SCRIPT_DIR, config_path)
         
         config = self.safe_load_json(full_path)
         if config is None:
@@ -274,7 +279,7 @@ class DataLoader:
     
     def __init__(self, project_dir: str = None):
         if project_dir is None:
-            project_dir = os.path.dirname(os.path.abspath(__file__))
+            project_dir = _SCRIPT_DIR
         
         self.project_dir = project_dir
         self.cleaner = DataCleaner(project_dir)
@@ -3,8 +3,8 @@
 """
 過去レースデータにtime_margin_paceを追加するスクリプト
 """
-import json
 import random
+import orjson
 
 def generate_time_margin_pace(finish, runners, distance):
     """
@@ -94,8 +94,8 @@ def add_pace_data_to_file(input_file, output_file):
     """
     JSONファイルにtime_margin_paceを追加
     """
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(input_file, 'rb') as f:
+        data = orjson.loads(f.read())
     
     # 各馬の過去レースにtime_margin_paceを追加
     for horse in data.get('horses', []):
@@ -108,8 +108,8 @@ def add_pace_data_to_file(input_file, output_file):
                 )
     
     # 出力
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     
     print(f"[OK] time_margin_paceを追加しました: {output_file}")
 
@@ -20,6 +20,34 @@ from running_style_analyzer import RunningStyleAnalyzer, determine_running_style
 logger = logging.getLogger(__name__)
 
 
+# 着順文字列（例: '3着'）から数字を抜き出すパターン
+_DIGITS_RE = re.compile(r'\d+')
+_ASCII_DIGITS_RE = re.compile(r'[0-9]+')
+
+# 穴馬DBのパス（モジュールと同じディレクトリ）
+_ANAUMA_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dark_horse.db')
+
+
+def _parse_result(result: Any, pattern: re.Pattern = _DIGITS_RE) -> Any:
+    """着順が文字列の場合は数値に変換（数字がなければ18）"""
+    if isinstance(result, str):
+        match = pattern.search(result)
+        return int(match.group()) if match else 18
+    return result
+
+
+def parse_weight_change(value: Any) -> Union[int, float]:
+    """馬体重変動を数値に変換（"+6"・"-4kg"等の文字列に対応、解釈できなければ0）"""
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.replace('+', '').replace('kg', '').strip())
+        except ValueError:
+            return 0
+    return 0
+
+
 # グローバルキャッシュ（メモリ効率化）
 _anauma_cache = LRUCache(maxsize=1000)
 
@@ -83,6 +111,17 @@ class HorseEvaluator:
     DARK_HORSE_SCORE_HIGH = 80
     DARK_HORSE_SCORE_MID = 65
     DARK_HORSE_SCORE_LOW = 40
+    
+    # グレードの序列（数字が大きいほど格上）
+    GRADE_LEVELS = {
+        'GI': 5,
+        'GII': 4,
+        'GIII': 3,
+        'OP': 2,  # オープン・リステッド
+        '3勝': 1,
+        '2勝': 0,
+        '1勝': -1
+    }
 
     def __init__(self, config: Dict[str, Any] = None, mode: str = 'full'):
         """
@@ -92,12 +131,16 @@ class HorseEvaluator:
         """
         self.config = config or {}
         self.mode = mode
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.anauma_db = FastAnaumaDB(os.path.join(script_dir, 'dark_horse.db'))
+        self.anauma_db = FastAnaumaDB(_ANAUMA_DB_PATH)
 
         # モード別ウェイト設定
         self.ability_weights = self._get_ability_weights_for_mode(mode)
         self.value_weights = self._get_value_weights_for_mode(mode)
+        # 格上挑戦減点を使うウェイトがなければ計算自体を省略
+        self.apply_class_penalty = (
+            self.ability_weights.get('apply_class_penalty', False) or
+            self.value_weights.get('apply_class_penalty', False)
+        )
 
     def _get_ability_weights_for_mode(self, mode: str) -> Dict[str, float]:
         """モード別の実力評価ウェイトを取得"""
@@ -207,18 +250,27 @@ class HorseEvaluator:
             # 脚質展開分析をスキップ（1分/3分モード）
             adjustments = {h.get('name'): 1.0 for h in horses}
         
-        # 実力評価（本命・対抗用）
+        # レース単位で共通の条件は馬ごとのループの外で1回だけ求める
+        race_ctx = self._build_race_context(race_data)
+        
+        # 要素スコアはウェイトに依存しないため、各馬1回だけ計算して両評価で共有
         with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
-            ability_results = list(executor.map(
-                lambda h: self._evaluate_horse(h, race_data, self.ability_weights, adjustments.get(h.get('name'), 1.0)), horses
+            factor_scores = list(executor.map(
+                lambda h: self._calc_factor_scores(h, race_ctx), horses
             ))
+        
+        # 実力評価（本命・対抗用）
+        ability_results = [
+            self._evaluate_horse(h, scores, self.ability_weights, adjustments.get(h.get('name'), 1.0))
+            for h, scores in zip(horses, factor_scores)
+        ]
         ability_results.sort(key=lambda x: x['final_score'], reverse=True)
         
         # 期待値評価（穴馬用）
-        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
-            value_results = list(executor.map(
-                lambda h: self._evaluate_horse(h, race_data, self.value_weights, adjustments.get(h.get('name'), 1.0)), horses
-            ))
+        value_results = [
+            self._evaluate_horse(h, scores, self.value_weights, adjustments.get(h.get('name'), 1.0))
+            for h, scores in zip(horses, factor_scores)
+        ]
         value_results.sort(key=lambda x: x['final_score'], reverse=True)
         
         return {
@@ -227,21 +279,55 @@ class HorseEvaluator:
             'pace_analysis': {'pace': pace, 'adjustments': adjustments}
         }
     
-    def _evaluate_horse(self, horse: Dict[str, Any], race_data: Dict[str, Any], weights: Dict[str, float], adjustment: float = 1.0) -> Dict[str, Any]:
-        """単一馬の評価"""
-        # 各要素評価
+    def _build_race_context(self, race_data: Dict[str, Any]) -> Dict[str, Any]:
+        """全馬で共通のレース条件（距離・競馬場・馬場・開催日・グレード）"""
+        race_info = race_data.get('race_info', {})
+        
+        race_date = None
+        race_date_str = race_info.get('date')
+        if race_date_str:
+            try:
+                race_date = datetime.strptime(race_date_str, '%Y-%m-%d')
+            except (ValueError, TypeError):
+                race_date = None
+        
+        return {
+            'distance': race_data.get('distance', 2000),
+            'track': race_info.get('track', ''),
+            'track_condition': race_info.get('track_condition', '良'),
+            'race_date': race_date,
+            'grade_level': self.GRADE_LEVELS.get(race_info.get('grade', ''), 2)
+        }
+    
+    def _calc_factor_scores(self, horse: Dict[str, Any], race_ctx: Dict[str, Any]) -> Dict[str, float]:
+        """単一馬の要素スコア（ウェイト非依存）"""
         past_score = self._eval_past_performance(horse)
-        course_score = self._eval_course_fit(horse, race_data)
-        track_score = self._eval_track_condition(horse, race_data)
-        weight_change_score = self._eval_weight_change(horse)
-        interval_score = self._eval_interval(horse, race_data)
-        odds_score = self._eval_odds_value(horse, past_score, course_score)
-        dark_score = self._eval_dark_horse(horse)
+        course_score = self._eval_course_fit(horse, race_ctx)
+        return {
+            'past': past_score,
+            'course': course_score,
+            'track': self._eval_track_condition(horse, race_ctx),
+            'weight_change': self._eval_weight_change(horse),
+            'interval': self._eval_interval(horse, race_ctx),
+            'odds': self._eval_odds_value(horse, past_score, course_score),
+            'dark': self._eval_dark_horse(horse),
+            'class_penalty': self._eval_class_penalty(horse, race_ctx) if self.apply_class_penalty else 0
+        }
+    
+    def _evaluate_horse(self, horse: Dict[str, Any], scores: Dict[str, float], weights: Dict[str, float], adjustment: float = 1.0) -> Dict[str, Any]:
+        """単一馬の評価（要素スコアにウェイトを適用）"""
+        past_score = scores['past']
+        course_score = scores['course']
+        track_score = scores['track']
+        weight_change_score = scores['weight_change']
+        interval_score = scores['interval']
+        odds_score = scores['odds']
+        dark_score = scores['dark']
         
         # 格上挑戦減点（実力評価のみ）
         class_penalty = 0
         if weights.get('apply_class_penalty', False):
-            class_penalty = self._eval_class_penalty(horse, race_data)
+            class_penalty = scores['class_penalty']
         
         # 最終スコア
         final = (
@@ -286,11 +372,7 @@ class HorseEvaluator:
         scores, weights = [], [1.5, 1.2, 1.0, 0.8, 0.5]
         for i, race in enumerate(races[:5]):
             # finishフィールドを使用（JSONデータの実際の構造に合わせる）
-            result = race.get('finish', race.get('result', 18))
-            if isinstance(result, str):
-                import re
-                match = re.search(r'\d+', result)
-                result = int(match.group()) if match else 18
+            result = _parse_result(race.get('finish', race.get('result', 18)))
             
             # 頭数を考慮した評価
             runners = race.get('runners', 16)
@@ -330,20 +412,9 @@ class HorseEvaluator:
         # 調子トレンド（30%）
         trend = 0
         if len(races) >= 3:
-            for i in range(1, 3):
-                current_result = races[i].get('result', 18)
-                prev_result = races[i-1].get('result', 18)
-                
-                # resultが文字列の場合は数値に変換
-                if isinstance(current_result, str):
-                    import re
-                    match = re.search(r'\d+', current_result)
-                    current_result = int(match.group()) if match else 18
-                if isinstance(prev_result, str):
-                    import re
-                    match = re.search(r'\d+', prev_result)
-                    prev_result = int(match.group()) if match else 18
-                
+            # 直近3走の着順を1回だけ変換して隣接ペアで比較
+            results = [_parse_result(race.get('result', 18)) for race in races[:3]]
+            for prev_result, current_result in zip(results, results[1:]):
                 if current_result < prev_result:
                     trend += 15  # 上昇
                 elif current_result > prev_result:
@@ -351,40 +422,31 @@ class HorseEvaluator:
         
         return base * 0.7 + (50 + trend) * 0.3
     
-    def _eval_course_fit(self, horse: Dict[str, Any], race_data: Dict[str, Any]) -> float:
+    def _eval_course_fit(self, horse: Dict[str, Any], race_ctx: Dict[str, Any]) -> float:
         """コース適性：距離60% + 競馬場40%（35%）"""
         races = horse.get('recent_races', [])
         if not races: return 60
         
-        current_dist = race_data.get('distance', 2000)
-        current_track = race_data.get('race_info', {}).get('track', '')
+        current_dist = race_ctx['distance']
+        current_track = race_ctx['track']
         
-        # 距離適性（60%）
+        # 距離適性（60%）・競馬場適性（40%）を直近5走の1パスで集計
         dist_score = 60
+        track_score = 60
         for race in races[:5]:
-            if abs(race.get('distance', 0) - current_dist) <= 200:
-                result = race.get('finish', race.get('result', 18))  # finishを優先
-                # resultが文字列の場合は数値に変換
-                if isinstance(result, str):
-                    import re
-                    match = re.search(r'\d+', result)
-                    result = int(match.group()) if match else 18
+            dist_match = abs(race.get('distance', 0) - current_dist) <= 200
+            track_match = race.get('venue', race.get('track', '')) == current_track
+            if not (dist_match or track_match):
+                continue
+            
+            result = _parse_result(race.get('finish', race.get('result', 18)))  # finishを優先
+            if dist_match:
                 if result <= 3: dist_score += 12
                 elif result <= 5: dist_score += 4
-        dist_score = min(100, dist_score)
-        
-        # 競馬場適性（40%）
-        track_score = 60
-        for race in races[:5]:
-            if race.get('venue', race.get('track', '')) == current_track:
-                result = race.get('finish', race.get('result', 18))  # finishを優先
-                # resultが文字列の場合は数値に変換
-                if isinstance(result, str):
-                    import re
-                    match = re.search(r'\d+', result)
-                    result = int(match.group()) if match else 18
+            if track_match:
                 if result <= 3: track_score += 15
                 elif result <= 5: track_score += 5
+        dist_score = min(100, dist_score)
         track_score = min(100, track_score)
         
         return dist_score * 0.6 + track_score * 0.4
@@ -399,12 +461,7 @@ class HorseEvaluator:
         
         for race in races[:5]:
             if race.get('class', '') == current_class:
-                result = race.get('result', 18)
-                # resultが文字列の場合は数値に変換
-                if isinstance(result, str):
-                    import re
-                    match = re.search(r'[0-9]+', result)
-                    result = int(match.group()) if match else 18
+                result = _parse_result(race.get('result', 18), _ASCII_DIGITS_RE)
                 same_class_results.append(result)
         
         if not same_class_results: return 40  # 昇級直後はペナルティ
@@ -413,23 +470,18 @@ class HorseEvaluator:
         avg = sum(same_class_results) / len(same_class_results)
         return max(0, min(100, 100 - (avg - 1) * 10))
     
-    def _eval_track_condition(self, horse: Dict[str, Any], race_data: Dict[str, Any]) -> float:
+    def _eval_track_condition(self, horse: Dict[str, Any], race_ctx: Dict[str, Any]) -> float:
         """馬場状態適性（5%）"""
         races = horse.get('recent_races', [])
         if not races: return 50
         
-        current_condition = race_data.get('race_info', {}).get('track_condition', '良')
+        current_condition = race_ctx['track_condition']
         
         # 同じ馬場状態での成績
         same_condition_results = []
         for race in races[:5]:
             if race.get('track_condition', '') == current_condition:
-                result = race.get('result', 18)
-                # resultが文字列の場合は数値に変換
-                if isinstance(result, str):
-                    import re
-                    match = re.search(r'[0-9]+', result)
-                    result = int(match.group()) if match else 18
+                result = _parse_result(race.get('result', 18), _ASCII_DIGITS_RE)
                 same_condition_results.append(result)
         
         if not same_condition_results: return 50
@@ -437,15 +489,14 @@ class HorseEvaluator:
         avg = sum(same_condition_results) / len(same_condition_results)
         return max(0, min(100, 100 - (avg - 1) * 10))
     
-    def _eval_interval(self, horse: Dict[str, Any], race_data: Dict[str, Any]) -> float:
+    def _eval_interval(self, horse: Dict[str, Any], race_ctx: Dict[str, Any]) -> float:
         """前走間隔（10%）"""
-        race_date_str = race_data.get('race_info', {}).get('date')
+        race_date = race_ctx['race_date']
         races = horse.get('recent_races', [])
         
-        if not race_date_str or not races: return 0
+        if race_date is None or not races: return 0
         
         try:
-            race_date = datetime.strptime(race_date_str, '%Y-%m-%d')
             last_date = datetime.strptime(races[0].get('date', ''), '%Y-%m-%d')
             days = (race_date - last_date).days
         except: return 0
@@ -506,7 +557,7 @@ class HorseEvaluator:
     def _eval_weight_change(self, horse: Dict[str, Any]) -> float:
         """馬体重変動評価（3%）"""
         weight = horse.get('weight', 0)
-        weight_change = horse.get('weight_change', 0)
+        weight_change = parse_weight_change(horse.get('weight_change', 0))
         
         # 馬体重データがない場合は中立スコア
         if weight == 0 or weight == '?':
@@ -519,12 +570,6 @@ class HorseEvaluator:
             except:
                 return 50
         
-        if isinstance(weight_change, str):
-            try:
-                weight_change = int(weight_change.replace('+', '').replace('kg', '').strip())
-            except:
-                weight_change = 0
-        
         # 基本スコア
         score = 50
         
@@ -579,10 +624,10 @@ class HorseEvaluator:
         
         return max(0, min(100, score))
     
-    def _eval_class_penalty(self, horse: Dict[str, Any], race_data: Dict[str, Any]) -> float:
+    def _eval_class_penalty(self, horse: Dict[str, Any], race_ctx: Dict[str, Any]) -> float:
         """格上挑戦時の減点（実力評価のみに適用）"""
         # 今回のレースグレード
-        current_grade = race_data.get('race_info', {}).get('grade', '')
+        current_level = race_ctx['grade_level']
         
         # 前走情報
         races = horse.get('recent_races', [])
@@ -592,22 +637,9 @@ class HorseEvaluator:
         last_race = races[0]
         last_race_name = last_race.get('race', '')
         
-        # グレードの序列（数字が大きいほど格上）
-        grade_levels = {
-            'GI': 5,
-            'GII': 4,
-            'GIII': 3,
-            'OP': 2,  # オープン・リステッド
-            '3勝': 1,
-            '2勝': 0,
-            '1勝': -1
-        }
-        
-        current_level = grade_levels.get(current_grade, 2)
-        
         # 前走のグレード推定
         last_level = 2  # デフォルトはOP
-        for grade, level in grade_levels.items():
+        for grade, level in self.GRADE_LEVELS.items():
             if grade in last_race_name or grade in str(last_race.get('class', '')):
                 last_level = level
                 break
@@ -39,6 +39,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 実力評価ランキングの印（6位以降は「n番手」）
+_RANK_LABELS = {1: "◎本命", 2: "○対抗", 3: "▲単穴", 4: "△連下", 5: "☆5番手"}
+
 
 def fill_obsidian_template(template, race_data, ability_results, value_results):
     """Obsidianテンプレートにデータを埋め込む"""
@@ -203,8 +206,7 @@ def generate_software_analysis_txt(ability_results, value_results, betting_resul
     # 実力評価 TOP5
     lines.append("【実力評価ランキング TOP5】（実績・コース適性重視）")
     for i, horse in enumerate(ability_results[:5], 1):
-        labels = {1: "◎本命", 2: "○対抗", 3: "▲単穴", 4: "△連下", 5: "☆5番手"}
-        lines.append(f"{i}位 {labels.get(i, str(i)+'番手')}: {horse['number']}番 {horse['name']}")
+        lines.append(f"{i}位 {_RANK_LABELS.get(i, str(i)+'番手')}: {horse['number']}番 {horse['name']}")
         lines.append(f"     総合スコア: {horse['final_score']:.1f}点")
         lines.append(f"     オッズ: {horse['odds']}倍 (人気: {horse.get('popularity', '?')}番)")
         lines.append(f"     騎手: {horse['jockey']} / 体重: {horse['weight']}kg")
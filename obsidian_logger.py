@@ -4,11 +4,35 @@
 予測結果をMarkdownテンプレートに整形して出力
 """
 
+import heapq
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
 
+# テンプレートのプレースホルダ（{{name}}形式）
+_PLACEHOLDER_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+# 平均を取る評価因子（結果のキー -> 平均値のキー）
+_AVERAGE_SCORE_KEYS = {
+    'performance_score': 'performance',
+    'course_fit_score': 'course_fit',
+    'odds_value_score': 'odds_value',
+    'track_condition_score': 'track_condition',
+    'interval_score': 'interval',
+    'weight_change_score': 'weight_change',
+    'dark_horse_score': 'dark_horse',
+}
+
+
+@lru_cache(maxsize=8)
+def _read_template(path: str, mtime_ns: int) -> str:
+    """テンプレート本文を読み込む（更新時刻が変わらない限り再読込しない）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
 
 class ObsidianLogger:
     """予測結果をObsidian用Markdownに出力するクラス"""
@@ -52,8 +76,7 @@ class ObsidianLogger:
         if not self.template_path.exists():
             raise FileNotFoundError(f"テンプレートファイルが見つかりません: {self.template_path}")
 
-        with open(self.template_path, 'r', encoding='utf-8') as f:
-            template = f.read()
+        template = _read_template(str(self.template_path), self.template_path.stat().st_mtime_ns)
 
         # レース情報
         race_info = race_data.get('race_info', {})
@@ -74,50 +97,51 @@ class ObsidianLogger:
 
         # テンプレート置換
         replacements = {
-            '{{race_name}}': race_name,
-            '{{race_date}}': race_date,
-            '{{execution_date}}': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            '{{protocol_mode}}': protocol_mode,
-            '{{processing_time}}': f"{processing_time:.2f}",
-            '{{decision}}': decision,
-            '{{confidence}}': confidence,
-            '{{main_reason}}': main_reason,
-            '{{horse1_number}}': str(top3[0]['number']) if len(top3) > 0 else '-',
-            '{{horse1_name}}': top3[0]['name'] if len(top3) > 0 else '-',
-            '{{horse1_score}}': f"{top3[0]['final_score']:.2f}" if len(top3) > 0 else '-',
-            '{{horse2_number}}': str(top3[1]['number']) if len(top3) > 1 else '-',
-            '{{horse2_name}}': top3[1]['name'] if len(top3) > 1 else '-',
-            '{{horse2_score}}': f"{top3[1]['final_score']:.2f}" if len(top3) > 1 else '-',
-            '{{horse3_number}}': str(top3[2]['number']) if len(top3) > 2 else '-',
-            '{{horse3_name}}': top3[2]['name'] if len(top3) > 2 else '-',
-            '{{horse3_score}}': f"{top3[2]['final_score']:.2f}" if len(top3) > 2 else '-',
-            '{{past_performance_avg}}': f"{avg_scores.get('performance', 0):.1f}",
-            '{{course_fit_avg}}': f"{avg_scores.get('course_fit', 0):.1f}",
-            '{{odds_value_avg}}': f"{avg_scores.get('odds_value', 0):.1f}",
-            '{{track_condition_avg}}': f"{avg_scores.get('track_condition', 0):.1f}",
-            '{{interval_avg}}': f"{avg_scores.get('interval', 0):.1f}",
-            '{{weight_change_avg}}': f"{avg_scores.get('weight_change', 0):.1f}",
-            '{{dark_horse_avg}}': f"{avg_scores.get('dark_horse', 0):.1f}",
-            '{{pace_analysis}}': pace_analysis.get('pace', '不明'),
-            '{{betting_plan}}': betting_plan,
-            '{{pace_prediction}}': pace_prediction
+            'race_name': race_name,
+            'race_date': race_date,
+            'execution_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'protocol_mode': protocol_mode,
+            'processing_time': f"{processing_time:.2f}",
+            'decision': decision,
+            'confidence': confidence,
+            'main_reason': main_reason,
+            'horse1_number': str(top3[0]['number']) if len(top3) > 0 else '-',
+            'horse1_name': top3[0]['name'] if len(top3) > 0 else '-',
+            'horse1_score': f"{top3[0]['final_score']:.2f}" if len(top3) > 0 else '-',
+            'horse2_number': str(top3[1]['number']) if len(top3) > 1 else '-',
+            'horse2_name': top3[1]['name'] if len(top3) > 1 else '-',
+            'horse2_score': f"{top3[1]['final_score']:.2f}" if len(top3) > 1 else '-',
+            'horse3_number': str(top3[2]['number']) if len(top3) > 2 else '-',
+            'horse3_name': top3[2]['name'] if len(top3) > 2 else '-',
+            'horse3_score': f"{top3[2]['final_score']:.2f}" if len(top3) > 2 else '-',
+            'past_performance_avg': f"{avg_scores.get('performance', 0):.1f}",
+            'course_fit_avg': f"{avg_scores.get('course_fit', 0):.1f}",
+            'odds_value_avg': f"{avg_scores.get('odds_value', 0):.1f}",
+            'track_condition_avg': f"{avg_scores.get('track_condition', 0):.1f}",
+            'interval_avg': f"{avg_scores.get('interval', 0):.1f}",
+            'weight_change_avg': f"{avg_scores.get('weight_change', 0):.1f}",
+            'dark_horse_avg': f"{avg_scores.get('dark_horse', 0):.1f}",
+            'pace_analysis': pace_analysis.get('pace', '不明'),
+            'betting_plan': betting_plan,
+            'pace_prediction': pace_prediction
         }
 
         # Jinja2風の条件分岐を処理
         content = self._process_conditions(template, protocol_mode)
 
-        # 置換実行
-        for key, value in replacements.items():
-            content = content.replace(key, str(value))
+        # 置換実行（1パスで全プレースホルダを置換、未定義のものはそのまま残す）
+        content = _PLACEHOLDER_PATTERN.sub(
+            lambda m: str(replacements[m.group(1)]) if m.group(1) in replacements else m.group(0),
+            content
+        )
 
         # ファイル名生成
         safe_race_name = "".join(c for c in race_name if c.isalnum() or c in (' ', '_', '-')).strip()
         filename = f"prediction_{safe_race_name}_{race_date.replace('-', '')}.md"
         output_path = self.output_dir / filename
 
-        # ファイル書き込み
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # ファイル書き込み（エンコード済みバイト列を一括書き込み、改行はLFのまま）
+        output_path.write_bytes(content.encode('utf-8'))
 
         return str(output_path)
 
@@ -151,35 +175,29 @@ class ObsidianLogger:
     def _calculate_average_scores(self, horses: List[Dict[str, Any]]) -> Dict[str, float]:
         """トップ馬の平均スコアを計算"""
         if not horses:
-            return {key: 0.0 for key in ['past_performance', 'course_fit', 'odds_value',
-                                         'track_condition', 'interval', 'weight_change', 'dark_horse']}
+            return dict.fromkeys(_AVERAGE_SCORE_KEYS.values(), 0.0)
 
-        avg = {}
-        keys = ['performance_score', 'course_fit_score', 'odds_value_score',
-                'track_condition_score', 'interval_score', 'weight_change_score', 'dark_horse_score']
-
-        for key in keys:
-            values = [h.get(key, 0) for h in horses]
-            avg[key.replace('_score', '')] = sum(values) / len(values) if values else 0.0
-
-        return avg
+        count = len(horses)
+        return {
+            name: sum(h.get(key, 0) for h in horses) / count
+            for key, name in _AVERAGE_SCORE_KEYS.items()
+        }
 
     def _format_pace_prediction(self, pace_analysis: Dict[str, Any]) -> str:
         """展開予想をフォーマット"""
         pace = pace_analysis.get('pace', '不明')
         adjustments = pace_analysis.get('adjustments', {})
 
-        prediction = f"**予想ペース**: {pace}\n\n"
+        lines = [f"**予想ペース**: {pace}\n\n"]
 
         if adjustments:
-            prediction += "**有利な馬**:\n"
-            # 補正値が高い順にソート
-            sorted_horses = sorted(adjustments.items(), key=lambda x: x[1], reverse=True)
-            for horse_name, adj in sorted_horses[:3]:
+            lines.append("**有利な馬**:\n")
+            # 補正値が高い上位3頭（全件ソートは不要）
+            for horse_name, adj in heapq.nlargest(3, adjustments.items(), key=lambda x: x[1]):
                 if adj > 1.0:
-                    prediction += f"- {horse_name} (補正: {adj:.2f})\n"
+                    lines.append(f"- {horse_name} (補正: {adj:.2f})\n")
 
-        return prediction
+        return "".join(lines)
 
     def _process_conditions(self, template: str, protocol_mode: str) -> str:
         """Jinja2風の条件分岐を簡易処理"""
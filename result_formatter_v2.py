@@ -4,119 +4,162 @@
 見やすく、分かりやすい予想結果を表示するためのモジュール
 """
 
-from typing import Dict, List, Any
+import bisect
+import io
+from itertools import islice
+from typing import Dict, Iterator, List, Any, TextIO
+
+from horse_evaluator import parse_weight_change
+
+# 高速化方針: 本モジュールは純粋な文字列整形のみで数値ループを持たないため、
+# Numba (@jit) は効果がなく起動コストだけが増える。導入しないこと。
+# 高速化はプロファイルを取った上で、文字列生成の回数削減で行う。
+
+
+# 評価グレード・星評価の閾値（score >= 閾値 で1段階上がる）
+_GRADE_THRESHOLDS = (50, 60, 70, 80, 90)
+_GRADES = ("E", "D", "C", "B", "A", "S")
+_STARS = ("☆☆☆☆☆", "★☆☆☆☆", "★★☆☆☆", "★★★☆☆", "★★★★☆", "★★★★★")
+
+# 上位3頭の順位マーク
+_RANK_MARKS = {1: "🥇1位", 2: "🥈2位", 3: "🥉3位"}
+
+# メイン推奨の印（実力評価の上位から順に割り当て）
+_MAIN_MARKS = ("◎ 本命", "○ 対抗", "▲ 単穴")
+
+# 評価表の行テンプレート（書式指定の解析はインポート時の1回のみ）
+_DETAIL_ROW = ("{rank:<6} {number:<6} {name:<22} {final:<8.1f} "
+               "{perf:<8.1f} {course:<8.1f} {track:<8.1f} "
+               "{weight:<8.1f} {interval:<8.1f} {odds:<10.1f}倍  {grade}")
+_VALUE_ROW = ("{rank:<6} {number:<6} {name:<22} {final:<8.1f} "
+              "{perf:<8.1f} {course:<8.1f} {odds_value:<12.1f} "
+              "{dark:<8.1f} {odds:<10.1f}倍  {grade}")
+
+_SEPARATOR = "=" * 100
+
+# フッター（差し込み値がないので固定文字列）
+_FOOTER = f"""{_SEPARATOR}
+📝 評価基準
+{_SEPARATOR}
+
+【能力系指標 70%】
+  ・過去成績: 25%  ・コース適正: 25%  ・馬場状態: 10%
+  ・馬体重変動: 3%  ・前走間隔: 7%
+
+【投資効率系指標 30%】
+  ・オッズ価値: 18%  ・穴馬要素: 12%
+
+評価ランク: S(90-100) / A(80-89) / B(70-79) / C(60-69) / D(50-59) / E(50未満)
+{_SEPARATOR}
+"""
 
 
 class ResultFormatterV2:
     """予想結果を見やすく表示する改善版フォーマッター"""
     
-    def __init__(self):
-        self.separator = "=" * 100
-        self.sub_separator = "-" * 100
-        self.box_separator = "┌" + "─" * 98 + "┐"
-        self.box_end = "└" + "─" * 98 + "┘"
+    # 区切り線（不変なのでクラス定義時に一度だけ生成）
+    separator = _SEPARATOR
+    sub_separator = "-" * 100
+    box_separator = "┌" + "─" * 98 + "┐"
+    mid_separator = "├" + "─" * 98 + "┤"
+    box_end = "└" + "─" * 98 + "┘"
     
     def format_complete_report(self, race_data: Dict[str, Any], 
                               ability_results: List[Dict[str, Any]], 
                               value_results: List[Dict[str, Any]]) -> str:
         """完全レポートを生成"""
-        output = []
-        
+        buf = io.StringIO()
+        self.write_complete_report(buf, race_data, ability_results, value_results)
+        return buf.getvalue()
+    
+    def write_complete_report(self, stream: TextIO, race_data: Dict[str, Any],
+                              ability_results: List[Dict[str, Any]],
+                              value_results: List[Dict[str, Any]]) -> None:
+        """完全レポートをセクションごとにストリームへ直接書き出す"""
+        sections = self._iter_sections(race_data, ability_results, value_results)
+        stream.write("\n".join(next(sections)))
+        for section in sections:
+            stream.write("\n")
+            stream.write("\n".join(section))
+    
+    def _iter_sections(self, race_data: Dict[str, Any],
+                       ability_results: List[Dict[str, Any]],
+                       value_results: List[Dict[str, Any]]) -> Iterator[List[str]]:
+        """レポートの各セクションを順に生成"""
         # ヘッダー
-        output.append(self._format_header(race_data))
+        yield self._format_header(race_data)
         
         # メイン推奨（最重要セクション）
-        output.append(self._format_main_recommendations(ability_results, value_results))
+        yield self._format_main_recommendations(ability_results, value_results)
         
         # 詳細評価表
-        output.append(self._format_detailed_table(ability_results))
+        yield self._format_detailed_table(ability_results)
         
         # 期待値ランキング
-        output.append(self._format_value_ranking(value_results))
+        yield self._format_value_ranking(value_results)
         
         # 馬体重分析
-        output.append(self._format_weight_analysis(ability_results))
+        yield self._format_weight_analysis(ability_results)
         
         # 買い目提案
-        output.append(self._format_betting_suggestions(ability_results, value_results))
+        yield self._format_betting_suggestions(ability_results, value_results)
         
         # フッター
-        output.append(self._format_footer())
-        
-        return "\n".join(output)
+        yield self._format_footer()
     
-    def _format_header(self, race_data: Dict[str, Any]) -> str:
+    def _format_header(self, race_data: Dict[str, Any]) -> List[str]:
         """レース情報ヘッダー"""
-        output = []
         race_info = race_data.get('race_info', {})
+        sep = self.separator
         
-        output.append("\n" + self.separator)
-        output.append("🏇 競馬予想システム - 予想結果レポート")
-        output.append(self.separator)
-        output.append("")
-        output.append(f"📋 レース名: {race_info.get('name', '不明')}")
-        output.append(f"📅 開催日: {race_info.get('date', '不明')}")
-        output.append(f"🏟️  競馬場: {race_info.get('track', '不明')}  "
-                     f"📏 距離: {race_data.get('distance', '不明')}m  "
-                     f"🌱 馬場: {race_info.get('track_condition', '不明')}")
-        output.append("")
-        
-        return "\n".join(output)
+        return [f"""
+{sep}
+🏇 競馬予想システム - 予想結果レポート
+{sep}
+
+📋 レース名: {race_info.get('name', '不明')}
+📅 開催日: {race_info.get('date', '不明')}
+"""
+                f"🏟️  競馬場: {race_info.get('track', '不明')}  "
+                f"📏 距離: {race_data.get('distance', '不明')}m  "
+                f"🌱 馬場: {race_info.get('track_condition', '不明')}\n"]
     
     def _format_main_recommendations(self, ability_results: List[Dict[str, Any]], 
-                                    value_results: List[Dict[str, Any]]) -> str:
+                                    value_results: List[Dict[str, Any]]) -> List[str]:
         """メイン推奨セクション（最も目立つ部分）"""
         output = []
         
         output.append(self.box_separator)
-        output.append("│" + " " * 35 + "🎯 本日の推奨馬" + " " * 48 + "│")
-        output.append("├" + "─" * 98 + "┤")
+        output.append(f"│{'':35}🎯 本日の推奨馬{'':48}│")
+        output.append(self.mid_separator)
         
-        if ability_results:
-            # 本命
-            honmei = ability_results[0]
-            stars_honmei = self._get_stars(honmei['final_score'])
-            output.append(f"│  ◎ 本命: {honmei['number']:>2}番 {honmei['name']:<20}  "
-                         f"総合評価: {honmei['final_score']:>5.1f}点 {stars_honmei:<15}  "
-                         f"オッズ: {honmei['odds']:>5.1f}倍" + " " * 10 + "│")
-            
-            # 対抗
-            if len(ability_results) > 1:
-                taikou = ability_results[1]
-                stars_taikou = self._get_stars(taikou['final_score'])
-                output.append(f"│  ○ 対抗: {taikou['number']:>2}番 {taikou['name']:<20}  "
-                             f"総合評価: {taikou['final_score']:>5.1f}点 {stars_taikou:<15}  "
-                             f"オッズ: {taikou['odds']:>5.1f}倍" + " " * 10 + "│")
-            
-            # 単穴
-            if len(ability_results) > 2:
-                tanana = ability_results[2]
-                stars_tanana = self._get_stars(tanana['final_score'])
-                output.append(f"│  ▲ 単穴: {tanana['number']:>2}番 {tanana['name']:<20}  "
-                             f"総合評価: {tanana['final_score']:>5.1f}点 {stars_tanana:<15}  "
-                             f"オッズ: {tanana['odds']:>5.1f}倍" + " " * 10 + "│")
+        # 本命・対抗・単穴（頭数が足りない分は出力しない）
+        for mark, horse in zip(_MAIN_MARKS, ability_results):
+            stars = self._get_stars(horse['final_score'])
+            output.append(f"│  {mark}: {horse['number']:>2}番 {horse['name']:<20}  "
+                         f"総合評価: {horse['final_score']:>5.1f}点 {stars:<15}  "
+                         f"オッズ: {horse['odds']:>5.1f}倍{'':10}│")
         
-        output.append("├" + "─" * 98 + "┤")
+        output.append(self.mid_separator)
         
         # 穴馬候補
         if value_results and ability_results:
-            top3_names = {h['name'] for h in ability_results[:3]}
-            anauma_candidates = [h for h in value_results if h['name'] not in top3_names][:2]
+            anauma_candidates = self._get_anauma_candidates(ability_results, value_results)
             
             if anauma_candidates:
-                output.append("│  💎 穴馬候補（高配当狙い）:" + " " * 71 + "│")
+                output.append(f"│  💎 穴馬候補（高配当狙い）:{'':71}│")
                 for i, horse in enumerate(anauma_candidates, 1):
                     stars = self._get_stars(horse['final_score'])
                     output.append(f"│     {i}. {horse['number']:>2}番 {horse['name']:<20}  "
                                  f"期待値評価: {horse['final_score']:>5.1f}点 {stars:<15}  "
-                                 f"オッズ: {horse['odds']:>5.1f}倍" + " " * 8 + "│")
+                                 f"オッズ: {horse['odds']:>5.1f}倍{'':8}│")
         
         output.append(self.box_end)
         output.append("")
         
-        return "\n".join(output)
+        return output
     
-    def _format_detailed_table(self, ability_results: List[Dict[str, Any]]) -> str:
+    def _format_detailed_table(self, ability_results: List[Dict[str, Any]]) -> List[str]:
         """詳細評価表（実力評価順）"""
         output = []
         
@@ -128,27 +171,27 @@ class ResultFormatterV2:
                      f"{'過去':<8} {'コース':<8} {'馬場':<8} {'馬体重':<8} {'間隔':<8} {'オッズ':<10}")
         output.append(self.sub_separator)
         
+        get_rank_mark = self._get_rank_mark
+        get_grade = self._get_grade
         for i, horse in enumerate(ability_results[:10], 1):
-            rank_mark = self._get_rank_mark(i)
-            grade = self._get_grade(horse['final_score'])
-            
-            output.append(
-                f"{rank_mark:<6} "
-                f"{horse['number']:<6} "
-                f"{horse['name']:<22} "
-                f"{horse['final_score']:<8.1f} "
-                f"{horse['performance_score']:<8.1f} "
-                f"{horse['course_fit_score']:<8.1f} "
-                f"{horse['track_condition_score']:<8.1f} "
-                f"{horse.get('weight_change_score', 50.0):<8.1f} "
-                f"{horse.get('interval_score', 0.0):<8.1f} "
-                f"{horse['odds']:<10.1f}倍  {grade}"
-            )
+            output.append(_DETAIL_ROW.format(
+                rank=get_rank_mark(i),
+                number=horse['number'],
+                name=horse['name'],
+                final=horse['final_score'],
+                perf=horse['performance_score'],
+                course=horse['course_fit_score'],
+                track=horse['track_condition_score'],
+                weight=horse.get('weight_change_score', 50.0),
+                interval=horse.get('interval_score', 0.0),
+                odds=horse['odds'],
+                grade=get_grade(horse['final_score'])
+            ))
         
         output.append("")
-        return "\n".join(output)
+        return output
     
-    def _format_value_ranking(self, value_results: List[Dict[str, Any]]) -> str:
+    def _format_value_ranking(self, value_results: List[Dict[str, Any]]) -> List[str]:
         """期待値ランキング（穴馬向け）"""
         output = []
         
@@ -160,26 +203,26 @@ class ResultFormatterV2:
                      f"{'過去':<8} {'コース':<8} {'オッズ価値':<12} {'穴馬':<8} {'オッズ':<10}")
         output.append(self.sub_separator)
         
+        get_rank_mark = self._get_rank_mark
+        get_grade = self._get_grade
         for i, horse in enumerate(value_results[:10], 1):
-            rank_mark = self._get_rank_mark(i)
-            grade = self._get_grade(horse['final_score'])
-            
-            output.append(
-                f"{rank_mark:<6} "
-                f"{horse['number']:<6} "
-                f"{horse['name']:<22} "
-                f"{horse['final_score']:<8.1f} "
-                f"{horse['performance_score']:<8.1f} "
-                f"{horse['course_fit_score']:<8.1f} "
-                f"{horse['odds_value_score']:<12.1f} "
-                f"{horse['dark_horse_score']:<8.1f} "
-                f"{horse['odds']:<10.1f}倍  {grade}"
-            )
+            output.append(_VALUE_ROW.format(
+                rank=get_rank_mark(i),
+                number=horse['number'],
+                name=horse['name'],
+                final=horse['final_score'],
+                perf=horse['performance_score'],
+                course=horse['course_fit_score'],
+                odds_value=horse['odds_value_score'],
+                dark=horse['dark_horse_score'],
+                odds=horse['odds'],
+                grade=get_grade(horse['final_score'])
+            ))
         
         output.append("")
-        return "\n".join(output)
+        return output
     
-    def _format_weight_analysis(self, ability_results: List[Dict[str, Any]]) -> str:
+    def _format_weight_analysis(self, ability_results: List[Dict[str, Any]]) -> List[str]:
         """馬体重変動分析"""
         output = []
         
@@ -191,7 +234,7 @@ class ResultFormatterV2:
         # 馬体重変動が大きい馬をピックアップ
         weight_notable = []
         for horse in ability_results[:10]:
-            weight_change = horse.get('weight_change', 0)
+            weight_change = parse_weight_change(horse.get('weight_change', 0))
             if abs(weight_change) >= 10:  # ±10kg以上
                 weight_notable.append({
                     'horse': horse,
@@ -213,10 +256,10 @@ class ResultFormatterV2:
             output.append("特に注目すべき馬体重変動はありません（±10kg未満）")
         
         output.append("")
-        return "\n".join(output)
+        return output
     
     def _format_betting_suggestions(self, ability_results: List[Dict[str, Any]], 
-                                   value_results: List[Dict[str, Any]]) -> str:
+                                   value_results: List[Dict[str, Any]]) -> List[str]:
         """買い目提案"""
         output = []
         
@@ -246,8 +289,7 @@ class ResultFormatterV2:
         
         # 穴馬狙い
         if value_results and ability_results:
-            top3_names = {h['name'] for h in ability_results[:3]}
-            anauma = [h for h in value_results if h['name'] not in top3_names][:2]
+            anauma = self._get_anauma_candidates(ability_results, value_results)
             
             if anauma:
                 honmei_num = ability_results[0]['number']
@@ -261,63 +303,27 @@ class ResultFormatterV2:
         output.append("※ 資金配分は各自の判断で調整してください")
         output.append("")
         
-        return "\n".join(output)
+        return output
     
-    def _format_footer(self) -> str:
+    def _format_footer(self) -> List[str]:
         """フッター"""
-        output = []
-        output.append(self.separator)
-        output.append("📝 評価基準")
-        output.append(self.separator)
-        output.append("")
-        output.append("【能力系指標 70%】")
-        output.append("  ・過去成績: 25%  ・コース適正: 25%  ・馬場状態: 10%")
-        output.append("  ・馬体重変動: 3%  ・前走間隔: 7%")
-        output.append("")
-        output.append("【投資効率系指標 30%】")
-        output.append("  ・オッズ価値: 18%  ・穴馬要素: 12%")
-        output.append("")
-        output.append("評価ランク: S(90-100) / A(80-89) / B(70-79) / C(60-69) / D(50-59) / E(50未満)")
-        output.append(self.separator)
-        output.append("")
-        
-        return "\n".join(output)
+        return [_FOOTER]
+    
+    def _get_anauma_candidates(self, ability_results: List[Dict[str, Any]],
+                               value_results: List[Dict[str, Any]],
+                               limit: int = 2) -> List[Dict[str, Any]]:
+        """実力評価上位3頭を除いた期待値評価上位の穴馬候補"""
+        top3_names = {h['name'] for h in ability_results[:3]}
+        return list(islice((h for h in value_results if h['name'] not in top3_names), limit))
     
     def _get_rank_mark(self, rank: int) -> str:
         """順位マーク"""
-        marks = {
-            1: "🥇1位",
-            2: "🥈2位", 
-            3: "🥉3位"
-        }
-        return marks.get(rank, f"  {rank}位")
+        return _RANK_MARKS.get(rank) or f"  {rank}位"
     
     def _get_grade(self, score: float) -> str:
         """評価グレード"""
-        if score >= 90:
-            return "S"
-        elif score >= 80:
-            return "A"
-        elif score >= 70:
-            return "B"
-        elif score >= 60:
-            return "C"
-        elif score >= 50:
-            return "D"
-        else:
-            return "E"
+        return _GRADES[bisect.bisect_right(_GRADE_THRESHOLDS, score)]
     
     def _get_stars(self, score: float) -> str:
         """星評価"""
-        if score >= 90:
-            return "★★★★★"
-        elif score >= 80:
-            return "★★★★☆"
-        elif score >= 70:
-            return "★★★☆☆"
-        elif score >= 60:
-            return "★★☆☆☆"
-        elif score >= 50:
-            return "★☆☆☆☆"
-        else:
-            return "☆☆☆☆☆"
+        return _STARS[bisect.bisect_right(_GRADE_THRESHOLDS, score)]
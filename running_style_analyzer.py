@@ -5,10 +5,17 @@
 レース展開（前残り/差し有利/平均）を予測するモジュール
 """
 
+import heapq
 import math
 from statistics import mean, pstdev
 from typing import Dict, List, Tuple, Optional
 
+# 高速化方針: このモジュールの処理は辞書・文字列操作が中心で、数値計算は
+# 1レース20頭未満の小さな配列に限られる。Numba (@jit) はコンパイル時間と
+# 依存追加による起動コストが上回るため導入しない。数値部分の高速化が必要に
+# なった場合は、まずプロファイルを取り、NumPy によるベクトル化、それでも
+# 足りなければ Cython 等の事前コンパイル (AOT) を検討すること。
+
 
 # 脚質の定義
 RUNNING_STYLE_LABELS = {
@@ -26,6 +33,16 @@ PACE_LABELS = {
     'AVERAGE': '平均'
 }
 
+# 判定処理で頻繁に参照するラベル
+_STYLE_ESCAPE = RUNNING_STYLE_LABELS['ESCAPE']
+_STYLE_LEADING = RUNNING_STYLE_LABELS['LEADING']
+_STYLE_CHASE = RUNNING_STYLE_LABELS['CHASE']
+_STYLE_PURSUE = RUNNING_STYLE_LABELS['PURSUE']
+_STYLE_UNKNOWN = RUNNING_STYLE_LABELS['UNKNOWN']
+_PACE_FRONT = PACE_LABELS['FRONT_FAVORED']
+_PACE_CLOSER = PACE_LABELS['CLOSER_FAVORED']
+_PACE_AVERAGE = PACE_LABELS['AVERAGE']
+
 
 def _calculate_z_scores(values: List[float]) -> List[float]:
     """
@@ -39,12 +56,11 @@ def _calculate_z_scores(values: List[float]) -> List[float]:
     """
     if not values:
         return []
+    if len(values) == 1:
+        return [0.0]
     
     mu = mean(values)
-    try:
-        sigma = pstdev(values)
-    except:
-        sigma = 0.0
+    sigma = pstdev(values)
     
     if sigma == 0:
         return [0.0 for _ in values]
@@ -74,7 +90,7 @@ def determine_running_style(
     
     # データ不足の場合
     if total == 0:
-        return RUNNING_STYLE_LABELS['UNKNOWN']
+        return _STYLE_UNKNOWN
     
     front_ratio = front_count / total
     
@@ -83,22 +99,22 @@ def determine_running_style(
         # 75%以上前で競馬 → 逃げ or 先行
         # avg_posが良ければ逃げ、そうでなければ先行
         if avg_pos and avg_pos <= 5.0:
-            return RUNNING_STYLE_LABELS['ESCAPE']
+            return _STYLE_ESCAPE
         else:
-            return RUNNING_STYLE_LABELS['LEADING']
+            return _STYLE_LEADING
             
     elif front_ratio >= 0.40:
         # 40-75%前 → 先行
-        return RUNNING_STYLE_LABELS['LEADING']
+        return _STYLE_LEADING
         
     elif front_ratio >= 0.15:
         # 15-40%前 → 差し
-        return RUNNING_STYLE_LABELS['CHASE']
+        return _STYLE_CHASE
         
     else:
         # 15%未満前 → 追込
         # avg_upが良ければ（小さければ）より追込確度が高い
-        return RUNNING_STYLE_LABELS['PURSUE']
+        return _STYLE_PURSUE
 
 
 class RunningStyleAnalyzer:
@@ -166,14 +182,18 @@ class RunningStyleAnalyzer:
             c = float(h.get('close_count', 0) or 0)
             
             # avg_pos（小さい=好成績）で前傾スコアに弱い補正
-            ap = h.get('avg_pos')
-            if ap:
-                f += max(0.0, (11.0 - float(ap)) / 10.0) * 0.25
+            ap = float(h['avg_pos']) if h.get('avg_pos') else None
+            if ap is not None:
+                f_boost = (11.0 - ap) / 10.0
+                if f_boost > 0.0:
+                    f += f_boost * 0.25
             
             # avg_up（小さい=末脚がある）で後傾スコアに補正
-            au = h.get('avg_up')
-            if au:
-                c += max(0.0, (40.0 - float(au)) / 6.0) * 0.6
+            au = float(h['avg_up']) if h.get('avg_up') else None
+            if au is not None:
+                c_boost = (40.0 - au) / 6.0
+                if c_boost > 0.0:
+                    c += c_boost * 0.6
             
             front_features.append(f)
             close_features.append(c)
@@ -191,43 +211,45 @@ class RunningStyleAnalyzer:
         # 前傾上位馬の合計（正の値のみ）
         front_top_sum = sum(
             max(0, z) 
-            for _, z, _ in sorted(paired, key=lambda x: x[1], reverse=True)[:self.top_n]
+            for _, z, _ in heapq.nlargest(self.top_n, paired, key=lambda x: x[1])
         )
         
         # 後傾上位馬の合計（正の値のみ）
         close_top_sum = sum(
             max(0, z)
-            for _, _, z in sorted(paired, key=lambda x: x[2], reverse=True)[:self.top_n]
+            for _, _, z in heapq.nlargest(self.top_n, paired, key=lambda x: x[2])
         )
         
         # 展開判定
         if front_top_sum > close_top_sum * (1.0 + self.bias_threshold):
-            pace_label = PACE_LABELS['FRONT_FAVORED']
+            pace_label = _PACE_FRONT
         elif close_top_sum > front_top_sum * (1.0 + self.bias_threshold):
-            pace_label = PACE_LABELS['CLOSER_FAVORED']
+            pace_label = _PACE_CLOSER
         else:
-            pace_label = PACE_LABELS['AVERAGE']
+            pace_label = _PACE_AVERAGE
         
         # --- Step 5: 各馬への補正倍率計算 ---
-        max_adjustment = min(0.10, self.adjustment_scale * 1.25)  # 最大±10%
-        adjustments = {}
-        
-        for name in names:
-            fz = front_z_map.get(name, 0.0)
-            cz = close_z_map.get(name, 0.0)
-            
-            # 展開に応じた有利・不利の算出
-            if pace_label == PACE_LABELS['CLOSER_FAVORED']:
-                raw_diff = cz - fz  # 差し有利なら後傾馬が有利
-            elif pace_label == PACE_LABELS['FRONT_FAVORED']:
-                raw_diff = fz - cz  # 前残りなら前傾馬が有利
-            else:
-                raw_diff = 0.0  # 平均ペースなら補正なし
+        if pace_label == _PACE_AVERAGE:
+            # 平均ペースなら補正なし（全馬 tanh(0) = 0 → 倍率1.0）
+            adjustments = dict.fromkeys(names, 1.0)
+        else:
+            max_adjustment = min(0.10, self.adjustment_scale * 1.25)  # 最大±10%
+            adjustments = {}
             
-            # tanh で -1〜1 に圧縮（極端な補正を抑える）
-            scaled = math.tanh(raw_diff)
-            multiplier = 1.0 + max(-max_adjustment, min(max_adjustment, scaled * self.adjustment_scale))
-            adjustments[name] = round(multiplier, 4)
+            for name in names:
+                fz = front_z_map.get(name, 0.0)
+                cz = close_z_map.get(name, 0.0)
+                
+                # 展開に応じた有利・不利の算出
+                if pace_label == _PACE_CLOSER:
+                    raw_diff = cz - fz  # 差し有利なら後傾馬が有利
+                else:
+                    raw_diff = fz - cz  # 前残りなら前傾馬が有利
+                
+                # tanh で -1〜1 に圧縮（極端な補正を抑える）
+                scaled = math.tanh(raw_diff)
+                multiplier = 1.0 + max(-max_adjustment, min(max_adjustment, scaled * self.adjustment_scale))
+                adjustments[name] = round(multiplier, 4)
         
         # --- メタデータ ---
         metadata = {